@@ -5,11 +5,10 @@ import re
 import sys
 from collections import OrderedDict
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 from pinto import __version__
 from pinto.logging import logger
-from pinto.project import Pipeline, Project
 
 _commands = OrderedDict()
 
@@ -42,7 +41,44 @@ class CommandMeta(type):
         return cls._subparser
 
 
-def build_base_parser(parser: argparse.ArgumentParser):
+# root-level flags which consume the argument following them
+_valued_flags = ("--log-file", "-p", "--project")
+
+
+def _is_valued_flag(arg: str) -> bool:
+    # argparse will also accept unambiguous prefixes
+    # of long flags, e.g. `--proj` for `--project`
+    if arg.startswith("--") and len(arg) > 2:
+        return any(flag.startswith(arg) for flag in _valued_flags)
+
+    # short flags can be grouped, e.g. `-vp` for `-v -p`, and
+    # the first valued flag in the group takes the rest of the
+    # group as its value, or the next argument if it's last
+    if arg.startswith("-") and len(arg) > 1:
+        for i, char in enumerate(arg[1:], 2):
+            if "-" + char in _valued_flags:
+                return i == len(arg)
+    return False
+
+
+def _find_command(args: List[str]) -> Optional[str]:
+    """
+    Find the first positional argument in `args`, which
+    argparse will treat as the name of the subcommand
+    """
+
+    args = iter(args)
+    for arg in args:
+        if _is_valued_flag(arg):
+            next(args, None)
+        elif not arg.startswith("-"):
+            return arg
+    return None
+
+
+def build_base_parser(
+    parser: argparse.ArgumentParser, args: Optional[List[str]] = None
+):
     parser.add_argument(
         "--version", action="version", version=f"Pinto version {__version__}"
     )
@@ -61,9 +97,20 @@ def build_base_parser(parser: argparse.ArgumentParser):
         default=os.getcwd(),
     )
 
-    # now add subparsers for each subcommand we want to implement
+    # now add subparsers for each subcommand we want to implement.
+    # Only one of them will ever get invoked, so if we can tell
+    # which one from the command line just build that, otherwise
+    # build them all so that help and error messages are complete
+    if args is None:
+        args = sys.argv[1:]
+    name = _find_command(args)
+    if name in _commands:
+        commands = [_commands[name]]
+    else:
+        commands = _commands.values()
+
     subparsers = parser.add_subparsers(dest="command")
-    for command in _commands.values():
+    for command in commands:
         command.build_parser(subparsers)
 
 
@@ -114,6 +161,11 @@ class RunCommand(Command):
 
     @classmethod
     def get_project(cls, project: str):
+        # pinto.project pulls in poetry and conda, which make up
+        # the bulk of our startup time, so only import it once
+        # we actually need a project rather than e.g. `--version`
+        from pinto.project import Pipeline, Project
+
         # first see if the project_path is to a single project
         try:
             return Project(project)
@@ -129,6 +181,8 @@ class RunCommand(Command):
 
     @classmethod
     def print_help(cls, flags: argparse.Namespace) -> None:
+        from pinto.project import Project
+
         project = cls.get_project(flags.project)
         if isinstance(project, Project):
             msg = cls.subparser.format_help() + "\n"
@@ -169,6 +223,8 @@ class RunCommand(Command):
 
     @classmethod
     def run(cls, flags: argparse.Namespace, extra_args: List[str]) -> None:
+        from pinto.project import Pipeline
+
         project = cls.get_project(flags.project)
         if isinstance(project, Pipeline):
             if len(extra_args) > 0:
@@ -208,6 +264,8 @@ class BuildCommand(Command):
         if len(extra_args) > 0:
             raise RuntimeError(f"Unknown arguments {extra_args}")
 
+        from pinto.project import Project
+
         project = Project(flags.project)
         project.install(flags.force, extras=flags.extras)
 
@@ -253,5 +311,24 @@ def main():
         command.check_and_run(flags, extra_args)
 
 
+def main_run_fast():
+    """
+    Lightweight entry point equivalent to `pinto -p <project> run`,
+    for use in loops which call pinto many times. Skips building
+    the full command line parser and only supports running
+    a pipeline or a command in a project's environment.
+    """
+
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.StreamHandler(stream=sys.stdout))
+
+    args = sys.argv[1:]
+    if not args or args[0] in ("-h", "--help"):
+        sys.exit("usage: pinto-run-fast PROJECT [COMMAND ...]")
+
+    flags = argparse.Namespace(project=args[0], environment=None)
+    RunCommand.run(flags, args[1:])
+
+
 if __name__ == "__main__":
     main()
@@ -10,12 +10,16 @@ from functools import wraps
 from pathlib import Path
 from typing import TYPE_CHECKING, Iterable, Optional
 
-import toml
 from cleo.application import Application
 
 from pinto.logging import logger
 from pinto.utils import temp_env_set
 
+try:
+    import tomllib
+except ImportError:
+    import tomli as tomllib
+
 with warnings.catch_warnings():
     warnings.simplefilter("ignore")
     from poetry.factory import Factory
@@ -39,8 +43,8 @@ class Environment:
 
     def __new__(cls, project: "Project") -> "Environment":
         try:
-            with open(project.path / "poetry.toml", "r") as f:
-                poetry_config = toml.load(f)
+            with open(project.path / "poetry.toml", "rb") as f:
+                poetry_config = tomllib.load(f)
         except FileNotFoundError:
             env_class = PoetryEnvironment
         else:
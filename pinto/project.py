@@ -1,40 +1,154 @@
 import os
-from dataclasses import dataclass
+import pickle
+import struct
+import tempfile
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
 
-import toml
 from dotenv import load_dotenv
 
 from pinto.env import Environment
 from pinto.logging import logger
 from pinto.utils import temp_env_set
 
+try:
+    import tomllib
+except ImportError:
+    import tomli as tomllib
+
+# parsed `pyproject.toml` configs keyed by the absolute
+# path to the file as well as its modification time
+# and size, so that building multiple projects from the
+# same file (e.g. in a pipeline) only parses it once
+_TOML_CACHE: Dict[Tuple[str, int, int], Dict] = {}
+
+# name of the file, written next to each `pyproject.toml`,
+# which persists its parsed contents between invocations
+# of pinto when the `PINTO_CACHE` environment variable is set
+_CACHE_FILENAME = ".pinto_cache.pickle"
+
+
+# the cache file starts with the modification time and
+# size of the `pyproject.toml` it was built from, packed
+# as raw bytes so that they can be checked before we
+# go to the trouble (and risk) of unpickling anything
+_CACHE_HEADER = struct.Struct("<qq")
+
+
+def _read_cache(cache_path: str, header: Tuple[int, int]) -> Optional[Dict]:
+    try:
+        with open(cache_path, "rb") as f:
+            cached_header = f.read(_CACHE_HEADER.size)
+            if cached_header != _CACHE_HEADER.pack(*header):
+                return None
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        # a corrupted or incompatible cache shouldn't stop
+        # us from just falling back to parsing the config
+        logger.debug("Ignoring unreadable config cache %s: %s", cache_path, e)
+        return None
+
+
+def _write_cache(cache_path: str, header: Tuple[int, int], config: Dict):
+    # write to a temporary file and move it into place so
+    # that concurrent readers never see a partial cache
+    dirname = os.path.dirname(cache_path)
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=dirname, suffix=".tmp")
+    except OSError as e:
+        logger.debug("Can't write config cache %s: %s", cache_path, e)
+        return
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_CACHE_HEADER.pack(*header))
+            pickle.dump(config, f)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        # the cache is only ever best-effort, so
+        # don't let failures here stop anything
+        logger.debug("Can't write config cache %s: %s", cache_path, e)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _load_config(config_path: str) -> Dict:
+    stat = os.stat(config_path)
+    header = (stat.st_mtime_ns, stat.st_size)
+    key = (config_path,) + header
+    try:
+        return _TOML_CACHE[key]
+    except KeyError:
+        pass
+
+    use_cache = os.getenv("PINTO_CACHE") == "1"
+    if use_cache:
+        dirname = os.path.dirname(config_path)
+        cache_path = os.path.join(dirname, _CACHE_FILENAME)
+        config = _read_cache(cache_path, header)
+        if config is not None:
+            _TOML_CACHE[key] = config
+            return config
+
+    with open(config_path, "rb") as f:
+        config = tomllib.load(f)
+    _TOML_CACHE[key] = config
+
+    if use_cache:
+        _write_cache(cache_path, header, config)
+    return config
+
+
+def _parse_step(step: str) -> Tuple[str, str, Optional[str]]:
+    """
+    Break a pipeline step of the form `component:command`
+    or `component:command:subcommand` into its parts
+    """
+
+    parts = step.split(":")
+    if len(parts) == 3:
+        component, command, subcommand = parts
+    elif len(parts) == 2:
+        component, command = parts
+        subcommand = None
+    else:
+        raise ValueError(f"Can't parse pipeline step '{step}'")
+    return component, command, subcommand
+
 
-@dataclass
 class ProjectBase:
-    path: str
+    __slots__ = ("path", "_config", "_config_path")
 
-    def __post_init__(self):
-        self.path = Path(self.path).resolve()
+    def __init__(self, path: str):
+        self.path = Path(path).resolve()
         if not self.path.exists():
             raise ValueError(f"Project {self.path} does not exist")
 
-        config_path = self.path / "pyproject.toml"
+        self._config_path = os.path.join(self.path, "pyproject.toml")
         try:
-            with open(config_path, "r") as f:
-                self._config = toml.load(f)
+            self._config = _load_config(self._config_path)
         except FileNotFoundError:
             raise ValueError(
                 "{} {} has no associated 'pyproject.toml' "
                 "at location {}".format(
-                    self.__class__.__name__, self.path, config_path
+                    self.__class__.__name__, self.path, self._config_path
                 )
             )
 
+    def __repr__(self):
+        return f"{self.__class__.__name__}(path={self.path!r})"
+
     @property
     def config(self) -> Dict:
-        return self._config.copy()
+        """
+        The parsed contents of the project's `pyproject.toml`.
+        This object is shared between all projects built from
+        the same file, so it should be treated as read-only.
+        """
+        return self._config
 
     def load_dotenv(self, env: Optional[str] = None) -> None:
         if env is None or not os.path.isabs(env):
@@ -45,7 +159,6 @@ class ProjectBase:
             load_dotenv(env)
 
 
-@dataclass
 class Project(ProjectBase):
     """
     Represents an individual project or library with
@@ -54,19 +167,21 @@ class Project(ProjectBase):
     of command-line commands once installed
     """
 
-    def __post_init__(self):
-        super().__post_init__()
+    __slots__ = ("name", "_venv")
+
+    def __init__(self, path: str):
+        super().__init__(path)
         try:
             self.name = self._config["tool"]["poetry"]["name"]
         except KeyError as e:
             if "poetry" in str(e):
                 raise ValueError(
                     "Project config '{}' has no 'tool.poetry' table".format(
-                        self.path / "pyproject.toml"
+                        self._config_path
                     )
                 )
 
-        self._venv = Environment(self)
+        self._venv = None
 
     @property
     def pinto_config(self) -> dict:
@@ -76,13 +191,15 @@ class Project(ProjectBase):
         """
 
         try:
-            return self.config["tool"]["pinto"].copy()
+            return self.config["tool"]["pinto"]
         except KeyError:
             return {}
 
     @property
     def venv(self) -> Environment:
         """The virtual environment associated with this project"""
+        if self._venv is None:
+            self._venv = Environment(self)
         return self._venv
 
     def install(
@@ -102,33 +219,36 @@ class Project(ProjectBase):
                 Groups of extra dependencies to install
         """
 
-        if not self._venv.exists():
-            self._venv.create()
+        if not self.venv.exists():
+            self.venv.create()
 
         # ensure environment has this project
         # installed somewhere
-        if not self._venv.contains(self):
+        if not self.venv.contains(self):
             logger.info(
-                "Installing project '{}' from '{}' into "
-                "virtual environemnt '{}'".format(
-                    self.name, self.path, self._venv.name
-                )
+                "Installing project '%s' from '%s' into "
+                "virtual environment '%s'",
+                self.name,
+                self.path,
+                self.venv.name,
             )
-            self._venv.install(extras=extras, update=force)
+            self.venv.install(extras=extras, update=force)
         elif force:
             logger.info(
-                "Updating project '{}' from '{}' in "
-                "virtual environment '{}'".format(
-                    self.name, self.path, self._venv.name
-                )
+                "Updating project '%s' from '%s' in "
+                "virtual environment '%s'",
+                self.name,
+                self.path,
+                self.venv.name,
             )
-            self._venv.install(extras=extras, update=True)
+            self.venv.install(extras=extras, update=True)
         else:
             logger.info(
-                "Project '{}' at '{}' already installed in "
-                "virtual environment '{}'".format(
-                    self.name, self.path, self._venv.name
-                )
+                "Project '%s' at '%s' already installed in "
+                "virtual environment '%s'",
+                self.name,
+                self.path,
+                self.venv.name,
             )
 
     def run(self, *args: str, **kwargs: Any) -> str:
@@ -159,11 +279,17 @@ class Project(ProjectBase):
 
                 will execute `"cd /home && echo $PWD"` as the entire
                 argument of `/bin/bash -c`.
+            env:
+                Path to a file of environment variables to load
+                before executing the command. Defaults to the
+                `.env` file in the project directory, if any.
+            load_env:
+                If `False`, don't load any environment file.
         Returns:
             The standard output generated by executing the command
         """
 
-        if not self._venv.exists() or not self._venv.contains(self):
+        if not self.venv.exists() or not self.venv.contains(self):
             self.install()
 
         # check if the project has specified a CUDA version to run with
@@ -186,62 +312,69 @@ class Project(ProjectBase):
         # passed in from a .env file so that users
         # can override this default behavior if they
         # really really need to
-        self.load_dotenv(kwargs.get("env"))
+        if kwargs.get("load_env", True):
+            self.load_dotenv(kwargs.get("env"))
 
-        logger.debug(f"Executing command '{args}' in project {self.path}")
+        logger.debug("Executing command '%s' in project %s", args, self.path)
         with temp_env_set(**env):
-            response = self._venv.run(*args)
+            response = self.venv.run(*args)
         return response
 
 
-@dataclass
 class Pipeline(ProjectBase):
-    def __post_init__(self):
-        super().__post_init__()
-
-        config_path = self.path / "pyproject.toml"
+    __slots__ = (
+        "steps",
+        "parsed_steps",
+        "_typeo_config",
+        "_typeo_scripts",
+        "_projects",
+    )
+
+    def __init__(self, path: str):
+        super().__init__(path)
+
+        tool = self._config.get("tool", {})
         try:
-            _ = self.steps
+            self.steps = tool["pinto"]["steps"]
         except KeyError:
             raise ValueError(
-                f"Config file {config_path} has no '[tool.pinto]' "
+                f"Config file {self._config_path} has no '[tool.pinto]' "
                 "table or 'steps' key in it."
             )
         try:
-            _ = self.typeo_config
+            self._typeo_config = tool["typeo"]
         except KeyError:
             raise ValueError(
-                f"Config file {config_path} has no '[tool.typeo]' "
+                f"Config file {self._config_path} has no '[tool.typeo]' "
                 "table necessary to run projects."
             )
+        self._typeo_scripts = self._typeo_config.get("scripts", {})
+        self.parsed_steps = [_parse_step(step) for step in self.steps]
 
-    @property
-    def steps(self):
-        return self.config["tool"]["pinto"]["steps"]
-
-    @property
-    def typeo_config(self):
-        return self.config["tool"]["typeo"]
+        # projects used by steps of this pipeline, keyed by name,
+        # so that steps sharing a component share a single Project
+        self._projects: Dict[str, Project] = {}
 
     def create_project(self, name):
-        return Project(self.path / name)
+        try:
+            return self._projects[name]
+        except KeyError:
+            project = Project(os.path.join(self.path, name))
+            self._projects[name] = project
+            return project
 
     def run(self, env: Optional[str] = None):
         self.load_dotenv(env)
 
-        for step in self.steps:
-            logger.debug(f"Parsing pipeline step {step}")
-
-            try:
-                component, command, subcommand = step.split(":")
-            except ValueError:
-                try:
-                    component, command = step.split(":")
-                    subcommand = None
-                except ValueError:
-                    raise ValueError(f"Can't parse pipeline step '{step}'")
-
+        # build the project each step runs in before executing
+        # any of them, so that a missing component gets reported
+        # up front rather than after the steps preceding it have run
+        steps = []
+        for component, command, subcommand in self.parsed_steps:
             project = self.create_project(component)
+            steps.append((project, command, subcommand))
+
+        for project, command, subcommand in steps:
             stdout = self.run_step(project, command, subcommand)
             logger.info(stdout)
 
@@ -251,23 +384,18 @@ class Pipeline(ProjectBase):
         command: str,
         subcommand: Optional[str] = None,
     ):
-        typeo_arg = str(self.path)
-        try:
-            if command in self.typeo_config["scripts"]:
-                typeo_arg += ":" + command
-        except KeyError:
-            if subcommand is not None:
-                typeo_arg += "::" + subcommand
+        path = self.path
+        if command in self._typeo_scripts:
+            if subcommand is None:
+                typeo_arg = f"{path}:{command}"
+            else:
+                typeo_arg = f"{path}:{command}:{subcommand}"
+        elif subcommand is None:
+            typeo_arg = str(path)
         else:
-            if subcommand is not None:
-                typeo_arg += ":" + subcommand
-
-        # override the project's load_dotenv method
-        # so that it won't attempt to load any local
-        # environment file it might have
-        method = project.load_dotenv
-        project.load_dotenv = lambda env: None
-        try:
-            project.run(command, "--typeo", typeo_arg)
-        finally:
-            project.load_dotenv = method
+            typeo_arg = f"{path}::{subcommand}"
+
+        # don't let the project load any local environment
+        # file it might have, since the pipeline's own
+        # environment file should take precedence
+        return project.run(command, "--typeo", typeo_arg, load_env=False)
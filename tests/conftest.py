@@ -186,8 +186,8 @@ def poetry_env_context():
 @pytest.fixture
 def installed_project_tests(extras, capfd):
     def _test_installed_project(project):
-        assert project._venv.exists()
-        assert project._venv.contains(project)
+        assert project.venv.exists()
+        assert project.venv.contains(project)
 
         project.run("testme")
         output = capfd.readouterr()
@@ -1,9 +1,10 @@
+import argparse
 import shutil
 import subprocess
 
 import pytest
 
-from pinto.cli import _commands
+from pinto.cli import _commands, _find_command, build_base_parser
 from pinto.project import Project
 
 
@@ -17,6 +18,35 @@ def test_cli_command_objects():
     assert run.name == "run"
 
 
+@pytest.mark.parametrize(
+    "args,expected",
+    [
+        (["-p", "run", "build"], "build"),
+        (["-vp", "run", "build"], "build"),
+        (["-prun", "build"], "build"),
+        (["-vprun", "build"], "build"),
+        (["--project", "run", "build"], "build"),
+        (["--proj", "run", "build"], "build"),
+        (["--project=run", "build"], "build"),
+        (["--log-file", "run", "build"], "build"),
+        (["--log", "run", "build"], "build"),
+        (["-v", "run", "-f"], "run"),
+        (["-v", "--verbose"], None),
+        ([], None),
+    ],
+)
+def test_find_command(args, expected):
+    assert _find_command(args) == expected
+
+    # make sure the subparser for the command
+    # always gets built, and argparse agrees
+    # with us about which command was passed
+    parser = argparse.ArgumentParser(add_help=False)
+    build_base_parser(parser, args)
+    flags, _ = parser.parse_known_args(args)
+    assert flags.command == expected
+
+
 def run_command(cmd, cwd):
     response = subprocess.run(
         cmd, shell=False, capture_output=True, text=True, cwd=cwd
@@ -54,7 +84,7 @@ def test_cli_build_poetry(
     run_command(cmd, cwd)
 
     project = Project(project_dir)
-    with poetry_env_context(project._venv):
+    with poetry_env_context(project.venv):
         installed_project_tests(project)
 
     with pytest.raises(RuntimeError) as exc_info:
@@ -89,8 +119,8 @@ def test_cli_run_poetry(project_dir, project_flag, poetry_env_context):
             assert "ValueError: Project /bad/path does not exist" in msg
     finally:
         project = Project(project_dir)
-        if project._venv.exists():
-            with poetry_env_context(project._venv):
+        if project.venv.exists():
+            with poetry_env_context(project.venv):
                 pass
 
 
@@ -112,8 +142,25 @@ def test_cli_run_with_dotenv(
         validate_dotenv(project_dir, run_fn, RuntimeError)
     finally:
         project = Project(project_dir)
-        if project._venv.exists():
-            with poetry_env_context(project._venv):
+        if project.venv.exists():
+            with poetry_env_context(project.venv):
                 pass
 
         shutil.rmtree(project_dir)
+
+
+def test_cli_run_fast(project_dir, poetry_env_context):
+    cmd = [shutil.which("pinto-run-fast"), str(project_dir), "testme"]
+    try:
+        output = run_command(cmd, None)
+        assert output.rstrip().splitlines()[-1] == "can you hear me?"
+
+        with pytest.raises(RuntimeError) as exc_info:
+            run_command(cmd[:-1], None)
+        msg = str(exc_info.value)
+        assert "ValueError: Must provide a command to run!" in msg
+    finally:
+        project = Project(project_dir)
+        if project.venv.exists():
+            with poetry_env_context(project.venv):
+                pass
@@ -1,31 +1,35 @@
+import copy
 import os
+import pickle
 import shutil
+import struct
 from pathlib import Path
+from unittest.mock import Mock
 
 import pytest
 import toml
 import yaml
 
 from pinto.env import CondaEnvironment, PoetryEnvironment
-from pinto.project import Pipeline, Project
+from pinto.project import _TOML_CACHE, Pipeline, Project
 
 
 def test_poetry_project(
     project_dir, poetry_env_context, installed_project_tests, extras
 ):
     project = Project(project_dir)
-    assert isinstance(project._venv, PoetryEnvironment)
-    assert not project._venv.exists()
+    assert isinstance(project.venv, PoetryEnvironment)
+    assert not project.venv.exists()
 
     if extras is None:
         project.install()
     else:
         project.install(extras=["extra"])
 
-    with poetry_env_context(project._venv):
+    with poetry_env_context(project.venv):
         installed_project_tests(project)
 
-    bad_config = project.config
+    bad_config = copy.deepcopy(project.config)
     bad_config["tool"].pop("poetry")
     with open(project.path / "pyproject.toml", "w") as f:
         toml.dump(bad_config, f)
@@ -43,22 +47,22 @@ def test_conda_project(
     capfd,
 ):
     project = Project(complete_conda_project_dir)
-    assert isinstance(project._venv, CondaEnvironment)
-    assert not project._venv.exists()
+    assert isinstance(project.venv, CondaEnvironment)
+    assert not project.venv.exists()
 
     if not nest:
-        assert project._venv.name == "pinto-testenv"
+        assert project.venv.name == "pinto-testenv"
     elif nest == "base":
-        assert project._venv.name == "pinto-" + project.name
+        assert project.venv.name == "pinto-" + project.name
     else:
-        assert project._venv.name == project.name
+        assert project.venv.name == project.name
 
     if extras is None:
         project.install()
     else:
         project.install(extras=["extra"])
 
-    with conda_env_context(project._venv):
+    with conda_env_context(project.venv):
         project.run("python", "-c", "import requests;print('passed!')")
         output = capfd.readouterr().out
         assert output.splitlines()[-1] == "passed!"
@@ -301,7 +305,155 @@ def test_conda_env_with_ld_lib(
             assert stdout == "Nothin"
         else:
             paths = stdout.split(":")
-            assert f"{project._venv.env_root}/lib" in paths
+            assert f"{project.venv.env_root}/lib" in paths
             assert f"{prefix}/lib" in paths
     finally:
         shutil.rmtree(project_dir)
+
+
+def test_config_cache(make_project_dir, monkeypatch):
+    project_dir = make_project_dir("testlib")
+    config_path = project_dir / "pyproject.toml"
+    cache_path = project_dir / ".pinto_cache.pickle"
+
+    def write_cache(config, header=None):
+        if header is None:
+            stat = os.stat(config_path)
+            header = (stat.st_mtime_ns, stat.st_size)
+        with open(cache_path, "wb") as f:
+            f.write(struct.pack("<qq", *header))
+            pickle.dump(config, f)
+
+    def make_config(name):
+        config = copy.deepcopy(project.config)
+        config["tool"]["poetry"]["name"] = name
+        return config
+
+    try:
+        # without the environment variable set,
+        # no cache should get written
+        monkeypatch.delenv("PINTO_CACHE", raising=False)
+        project = Project(project_dir)
+        assert not cache_path.exists()
+
+        monkeypatch.setenv("PINTO_CACHE", "1")
+        _TOML_CACHE.clear()
+        project = Project(project_dir)
+        assert cache_path.exists()
+        assert project.name == "testlib"
+
+        # a cache with a header matching the config
+        # should get used in place of parsing the config
+        write_cache(make_config("cached-testlib"))
+        _TOML_CACHE.clear()
+        project = Project(project_dir)
+        assert project.name == "cached-testlib"
+
+        # updating the config should invalidate the cache
+        # without unpickling it, and rewrite it in its place
+        with open(config_path, "w") as f:
+            toml.dump(make_config("other-testlib"), f)
+
+        load = pickle.load
+        with monkeypatch.context() as m:
+            m.setattr(pickle, "load", Mock(side_effect=load))
+            _TOML_CACHE.clear()
+            project = Project(project_dir)
+            assert project.name == "other-testlib"
+            pickle.load.assert_not_called()
+
+        _TOML_CACHE.clear()
+        project = Project(project_dir)
+        assert project.name == "other-testlib"
+
+        # so should a cache from some other version of the
+        # config, even if its contents are otherwise valid
+        write_cache(make_config("stale-testlib"), header=(0, 0))
+        _TOML_CACHE.clear()
+        project = Project(project_dir)
+        assert project.name == "other-testlib"
+
+        # a corrupted cache should just get ignored
+        write_cache(None)
+        with open(cache_path, "r+b") as f:
+            f.seek(16)
+            f.write(b"not a pickle")
+            f.truncate()
+
+        _TOML_CACHE.clear()
+        project = Project(project_dir)
+        assert project.name == "other-testlib"
+    finally:
+        _TOML_CACHE.clear()
+        shutil.rmtree(project_dir)
+
+
+def test_pipeline_bad_step(tmp_path):
+    config = {
+        "tool": {
+            "pinto": {"steps": ["project1:testme1", "project2"]},
+            "typeo": {"scripts": {"testme1": {"i": 3}}},
+        }
+    }
+    with open(tmp_path / "pyproject.toml", "w") as f:
+        toml.dump(config, f)
+
+    with pytest.raises(ValueError) as exc_info:
+        Pipeline(tmp_path)
+    assert "Can't parse pipeline step 'project2'" in str(exc_info.value)
+
+
+def test_pipeline_create_project(make_project_dir):
+    for i in [1, 2]:
+        project_dir = make_project_dir(f"project{i}", subdir=True)
+
+    try:
+        with open(project_dir.parent / "pyproject.toml", "w") as f:
+            toml.dump(
+                {
+                    "tool": {
+                        "pinto": {"steps": ["project1:testme"]},
+                        "typeo": {},
+                    }
+                },
+                f,
+            )
+
+        pipeline = Pipeline(project_dir.parent)
+        project1 = pipeline.create_project("project1")
+        assert pipeline.create_project("project1") is project1
+
+        project2 = pipeline.create_project("project2")
+        assert project2 is not project1
+        assert project2.name == "project2"
+    finally:
+        shutil.rmtree(project_dir.parent)
+
+
+@pytest.mark.parametrize(
+    "command,subcommand,expected",
+    [
+        ("testme", None, "{}:testme"),
+        ("testme", "sub", "{}:testme:sub"),
+        ("other", None, "{}"),
+        ("other", "sub", "{}::sub"),
+    ],
+)
+def test_pipeline_run_step(tmp_path, command, subcommand, expected):
+    config = {
+        "tool": {
+            "pinto": {"steps": ["project1:testme"]},
+            "typeo": {"scripts": {"testme": {"i": 3}}},
+        }
+    }
+    with open(tmp_path / "pyproject.toml", "w") as f:
+        toml.dump(config, f)
+
+    pipeline = Pipeline(tmp_path)
+    project = Mock()
+    pipeline.run_step(project, command, subcommand)
+
+    typeo_arg = expected.format(pipeline.path)
+    project.run.assert_called_once_with(
+        command, "--typeo", typeo_arg, load_env=False
+    )